@@ -0,0 +1,217 @@
+"""
+Result cache for xcrun/simctl/xctrace metadata.
+Entries live in memory and are mirrored to ~/.cache/mcpxcode so they survive restarts.
+"""
+import functools
+import glob
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "mcpxcode")
+
+# Least recently used entries are dropped once the files in CACHE_DIR exceed this size
+CACHE_MAX_BYTES = 64 * 1024 ** 2
+
+# Sentinel returned by lookup() when there is no fresh entry
+MISS = object()
+
+# key -> (time.monotonic() when stored, value)
+_CACHE: Dict[Hashable, Tuple[float, Any]] = {}
+
+# group -> keys stored under it, so evict_group() finds them in memory
+_GROUPS: Dict[Hashable, set] = {}
+
+
+def _digest(value: Hashable) -> str:
+    return hashlib.sha1(repr(value).encode("utf-8")).hexdigest()
+
+
+def _disk_path(key: Hashable, group: Optional[Hashable] = None) -> str:
+    # Entries of a group share a file name prefix so they can be evicted together
+    if group is None:
+        return os.path.join(CACHE_DIR, f"{_digest(key)}.json")
+    return os.path.join(CACHE_DIR, f"{_digest(group)}-{_digest(key)}.json")
+
+
+def lookup(key: Hashable, ttl: float, group: Optional[Hashable] = None) -> Any:
+    """Return the cached value for key if younger than ttl seconds, else MISS.
+
+    Args:
+        key: Cache key, usually the argv tuple of the command
+        ttl: Maximum age of the entry in seconds
+        group: Group the entry was stored under, if any
+    """
+    entry = _CACHE.get(key)
+    if entry is not None:
+        stored_at, value = entry
+        if time.monotonic() - stored_at < ttl:
+            return value
+        del _CACHE[key]
+
+    path = _disk_path(key, group)
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return MISS
+
+    age = time.time() - data.get("time", 0)
+    if not 0 <= age < ttl:
+        return MISS
+
+    # Keep the original age so the in-memory entry expires with the disk one
+    _CACHE[key] = (time.monotonic() - age, data["value"])
+    if group is not None:
+        _GROUPS.setdefault(group, set()).add(key)
+    # The file mtime marks the entry as recently used for prune()
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return data["value"]
+
+
+def store(key: Hashable, value: Any, group: Optional[Hashable] = None) -> None:
+    """Store a JSON-serializable value for key in memory and on disk.
+
+    Args:
+        key: Cache key, usually the argv tuple of the command
+        value: Value to cache
+        group: Lets evict_group() drop this entry together with related ones
+    """
+    _CACHE[key] = (time.monotonic(), value)
+    if group is not None:
+        _GROUPS.setdefault(group, set()).add(key)
+
+    # The disk copy is only an optimization, so failures are ignored
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    except OSError:
+        return
+
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump({"time": time.time(), "value": value}, f)
+        os.replace(tmp_path, _disk_path(key, group))
+    except (OSError, TypeError, ValueError):
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return
+    prune()
+
+
+def prune() -> None:
+    """Remove the least recently used disk entries until the rest fit in CACHE_MAX_BYTES."""
+    try:
+        entries = sorted(((entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                          for entry in os.scandir(CACHE_DIR)
+                          if entry.is_file() and entry.name.endswith(".json")), reverse=True)
+    except OSError:
+        return
+    total = 0
+    for _, size, path in entries:
+        if total + size > CACHE_MAX_BYTES:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        else:
+            total += size
+
+
+def evict(key: Hashable, group: Optional[Hashable] = None) -> None:
+    """Drop the cached value for key from memory and disk.
+
+    Args:
+        key: Cache key to evict
+        group: Group the value was stored under, if any
+    """
+    _CACHE.pop(key, None)
+    try:
+        os.remove(_disk_path(key, group))
+    except OSError:
+        pass
+
+
+def evict_group(group: Hashable) -> None:
+    """Drop every value stored under group from memory and disk.
+
+    Args:
+        group: Group passed to store()
+    """
+    for key in _GROUPS.pop(group, ()):
+        _CACHE.pop(key, None)
+    for path in glob.glob(os.path.join(CACHE_DIR, f"{_digest(group)}-*.json")):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def memoize(key: Hashable, ttl: float, func, *args, group: Optional[Hashable] = None) -> Any:
+    """Return func(*args), reusing a cached result younger than ttl seconds.
+
+    Args:
+        key: Cache key for the result
+        ttl: Maximum age of the cached result in seconds
+        func: Function producing the value on a cache miss
+        *args: Arguments passed to func
+        group: Group the result is stored under, see store()
+    """
+    value = lookup(key, ttl, group)
+    if value is MISS:
+        value = func(*args)
+        store(key, value, group)
+    return value
+
+
+def cached(key: Callable[..., Optional[Hashable]], ttl: float = float("inf")):
+    """Decorator caching a function's result under key(*args).
+
+    Calls are bound to the function's signature first, so f(x), f(x, True)
+    and f(x, fallback=True) share an entry; key always gets every argument
+    positionally with defaults filled in. The key should capture everything
+    the result depends on (e.g. file mtimes), so entries stay valid until the
+    key changes. When key(*args) returns None the call is not cached.
+
+    The wrapper gets a cache_evict(*args) method taking the required
+    arguments; it drops the entries for every value of the optional ones.
+
+    Args:
+        key: Builds the cache key from the call arguments
+        ttl: Maximum age of a cached result in seconds
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        required = [name for name, param in signature.parameters.items()
+                    if param.default is inspect.Parameter.empty]
+
+        def group(bound: inspect.BoundArguments) -> Tuple:
+            return (func.__module__, func.__qualname__,
+                    *(bound.arguments[name] for name in required))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            cache_key = key(*bound.args, **bound.kwargs)
+            if cache_key is None:
+                return func(*bound.args, **bound.kwargs)
+            return memoize(cache_key, ttl, functools.partial(func, *bound.args, **bound.kwargs),
+                           group=group(bound))
+
+        def cache_evict(*args, **kwargs):
+            evict_group(group(signature.bind_partial(*args, **kwargs)))
+
+        wrapper.cache_evict = cache_evict
+        return wrapper
+    return decorator
@@ -1,17 +1,228 @@
-from typing import Any, Dict, List, Optional, Union
-from mcp.server.fastmcp import FastMCP
-import json
-import subprocess
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from contextlib import asynccontextmanager
+from mcp.server.fastmcp import Context, FastMCP
+import asyncio
+import os
+import signal
+import uuid
+import orjson
+import cache
+from simctl import read_devices
 # xctrace导入
 from xctrace import list_devices as xctrace_list_devices
-from xctrace import list_templates, record, export
+from xctrace import list_templates, record, export, export_slice, export_events
 from xctrace import record_with_options, attach, diagnose_archive
-from xctrace import document_template, analyze_trace, compare_traces
+from xctrace import document_template, analyze_trace, compare_traces, compare_traces_full
 # xcrun导入
 from xcrun import xcodebuild_list_sdks, xcodebuild_list_schemes, xcodebuild_build
 from xcrun import altool_validate_app, altool_upload_app
 from xcrun import swift_symbols, otool_headers, otool_libraries, nm_symbols
-mcp = FastMCP("MCPXcode")
+from xcrun import inspect_binary, batch_otool_libraries, swift_symbols_batch
+from xcrun import find_sdk, require_xcrun, SDK
+from xcrun import find_tool, preload_tools, reset_tools, xcrun_env, DEVELOPER_TOOLS
+
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP):
+    # Resolve simctl/xcodebuild/... once so tool calls can skip the xcrun dispatcher
+    await asyncio.to_thread(preload_tools)
+    # xcode-select may point at a different Xcode after SIGHUP; re-resolve tools lazily.
+    # Handled on the event loop rather than in whatever thread the signal interrupts.
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGHUP, reset_tools)
+    try:
+        yield
+    finally:
+        loop.remove_signal_handler(signal.SIGHUP)
+
+
+mcp = FastMCP("MCPXcode", lifespan=_lifespan)
+
+# Cache lifetime in seconds of the simulator device list
+DEVICES_TTL = 5
+
+_LIST_DEVICES_ARGS = ("list", "devices", "--json")
+
+# Upper bound on concurrently running child processes so bursts of tool calls
+# queue up instead of all paying xcrun startup at once
+MAX_INFLIGHT = 8
+_inflight_slots = asyncio.Semaphore(MAX_INFLIGHT)
+
+# argv -> task fetching it, for commands served through _cached_xcrun
+_inflight: Dict[tuple, asyncio.Task] = {}
+
+# job id -> task of a long-running tool started with background=True
+_jobs: Dict[str, asyncio.Task] = {}
+
+# Finished jobs kept for job_status before the oldest are dropped
+MAX_FINISHED_JOBS = 100
+
+# Seconds between progress notifications of long-running tools
+PROGRESS_INTERVAL = 1.0
+
+
+async def _run(argv: List[str]) -> Tuple[int, bytes, bytes]:
+    """Run a command without blocking the event loop.
+    
+    argv[0] must be an absolute path, as returned by find_tool() or require_xcrun().
+    
+    Returns:
+        Tuple[int, bytes, bytes]: Return code, stdout and stderr of the command
+    """
+    async with _inflight_slots:
+        # An absolute executable plus close_fds=False lets CPython start the child with
+        # posix_spawn instead of fork+exec, which would copy this process's page tables.
+        # Leaking descriptors is not a concern: Python creates them non-inheritable.
+        # stdin is the MCP stdio transport itself, so children never get to read it.
+        proc = await asyncio.create_subprocess_exec(
+            *argv,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=xcrun_env(),
+            close_fds=False
+        )
+        out, err = await proc.communicate()
+    return proc.returncode, out, err
+
+
+async def _xcrun(argv: List[str], error: str) -> bytes:
+    """Run a command and return its stdout.
+    
+    Raises:
+        Exception: With the given error prefix and stderr if the command fails
+    """
+    returncode, out, err = await _run(argv)
+    if returncode != 0:
+        raise Exception(f"{error}: {err.decode('utf-8', 'replace')}")
+    return out
+
+
+async def _simctl(*args: str) -> List[str]:
+    """Build a simctl command line that runs the resolved simctl binary directly."""
+    # Fail fast without Xcode instead of trying to spawn a missing tool
+    require_xcrun()
+    return [await asyncio.to_thread(find_tool, "simctl"), *args]
+
+
+async def _evict_device_list() -> None:
+    cache.evict(tuple(await _simctl(*_LIST_DEVICES_ARGS)))
+
+
+async def _simctl_run(error: str, *args: str, changes_devices: bool = False) -> bytes:
+    """Run a simctl subcommand, evicting the cached device list if it changes device state.
+    
+    Raises:
+        Exception: With the given error prefix and stderr if the command fails
+    """
+    out = await _xcrun(await _simctl(*args), error)
+    if changes_devices:
+        await _evict_device_list()
+    return out
+
+
+async def _simctl_fan_out(error: str, success: str, subcommand: str, device_ids: List[str],
+                          *args: str) -> Dict[str, str]:
+    """Run `simctl <subcommand> <device_id> *args` for several devices concurrently.
+    
+    Returns:
+        Dict[str, str]: Success message or error for each device
+    """
+    # A UDID listed twice would otherwise run simctl twice against the same device
+    device_ids = list(dict.fromkeys(device_ids))
+    results = await asyncio.gather(
+        *[_simctl_run(error, subcommand, device_id, *args, changes_devices=True)
+          for device_id in device_ids],
+        return_exceptions=True
+    )
+    return {device_id: str(result) if isinstance(result, BaseException) else f"{success} {device_id}"
+            for device_id, result in zip(device_ids, results)}
+
+
+async def _fetch(argv: tuple, parse: Callable[[bytes], Any], error: str) -> Any:
+    value = parse(await _xcrun(list(argv), error))
+    cache.store(argv, value)
+    return value
+
+
+async def _cached_xcrun(argv: tuple, ttl: float, parse: Callable[[bytes], Any], error: str) -> Any:
+    """Run a command and return its parsed stdout, reusing a cached result younger than ttl seconds.
+    
+    Concurrent cache misses for the same argv share a single child process.
+    """
+    value = cache.lookup(argv, ttl)
+    if value is not cache.MISS:
+        return value
+
+    # No await between the lookup and the insert, so no lock is needed
+    task = _inflight.get(argv)
+    if task is None:
+        task = asyncio.create_task(_fetch(argv, parse, error))
+        _inflight[argv] = task
+        task.add_done_callback(lambda _: _inflight.pop(argv, None))
+    # Shield so one cancelled caller does not cancel the fetch for the others
+    return await asyncio.shield(task)
+
+
+def _prune_jobs() -> None:
+    finished = [job_id for job_id, task in _jobs.items() if task.done()]
+    # Dicts keep insertion order, so the first finished jobs are the oldest
+    for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del _jobs[job_id]
+
+
+def _consume_result(task: asyncio.Task) -> None:
+    # Mark the exception as retrieved so an unpolled failed job is not logged as an error
+    if not task.cancelled():
+        task.exception()
+
+
+def _finish_job(job_id: str, task: asyncio.Task) -> Dict[str, str]:
+    # The final status is reported once; the job is forgotten afterwards
+    _jobs.pop(job_id, None)
+    if task.cancelled():
+        return {"job_id": job_id, "status": "failed", "error": "cancelled"}
+    if task.exception() is not None:
+        return {"job_id": job_id, "status": "failed", "error": str(task.exception())}
+    return {"job_id": job_id, "status": "succeeded", "result": task.result()}
+
+
+async def _long_running(job: Any, ctx: Optional[Context], background: bool,
+                        total: Optional[float] = None) -> str:
+    """Run a long-running tool coroutine without tying up the caller.
+    
+    With background=True the job is registered and its id returned immediately;
+    otherwise the job is awaited while elapsed seconds are sent as progress.
+    
+    Args:
+        job: Coroutine doing the work; long commands run via run_async so that
+            cancelling the job kills them instead of tying up a worker thread
+        ctx: Request context used for progress notifications
+        background: Return a job id instead of waiting for the result
+        total: Expected duration in seconds, if known
+    """
+    task = asyncio.create_task(job)
+    if background:
+        _prune_jobs()
+        job_id = uuid.uuid4().hex
+        _jobs[job_id] = task
+        task.add_done_callback(_consume_result)
+        return f"Started job {job_id}. Check it with job_status."
+
+    elapsed = 0.0
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=PROGRESS_INTERVAL)
+            if done:
+                return task.result()
+            elapsed += PROGRESS_INTERVAL
+            if ctx is not None:
+                await ctx.report_progress(elapsed, total)
+    except asyncio.CancelledError:
+        # Nobody else waits for a foreground job
+        task.cancel()
+        raise
+
 
 @mcp.tool()
 async def get_mcpxcode() -> str:
@@ -20,6 +231,45 @@ async def get_mcpxcode() -> str:
     return "Hello MCPXcode :) MCPXcode is MCP server for Xcode."
 
 
+@mcp.tool()
+async def job_status(job_id: str) -> Dict[str, str]:
+    """Get the status of a job started with background=True.
+    
+    Once a finished job's result has been returned, the job id is no longer known.
+    
+    Args:
+        job_id: Id returned when the job was started
+        
+    Returns:
+        Dict[str, str]: status (running, succeeded or failed) plus the result or error
+    """
+    task = _jobs.get(job_id)
+    if task is None:
+        raise Exception(f"Unknown job {job_id}")
+    if not task.done():
+        return {"job_id": job_id, "status": "running"}
+    return _finish_job(job_id, task)
+
+
+@mcp.tool()
+async def job_cancel(job_id: str) -> Dict[str, str]:
+    """Cancel a job started with background=True, killing the command it runs.
+    
+    Args:
+        job_id: Id returned when the job was started
+        
+    Returns:
+        Dict[str, str]: Final status of the job, as reported by job_status
+    """
+    task = _jobs.get(job_id)
+    if task is None:
+        raise Exception(f"Unknown job {job_id}")
+    if task.cancel():
+        # Returns once the child process has been killed and reaped
+        await asyncio.wait({task})
+    return _finish_job(job_id, task)
+
+
 @mcp.tool()
 async def list_devices() -> dict[str, Any]:
     """List all available simulator devices.
@@ -27,16 +277,13 @@ async def list_devices() -> dict[str, Any]:
     Returns:
         Dict[str, Any]: JSON response containing all available devices
     """
-    try:
-        result = subprocess.run(
-            ["xcrun", "simctl", "list", "devices", "--json"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return json.loads(result.stdout)
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to list devices: {e.stderr}")
+    # Reading the device set from disk skips the xcrun + CoreSimulator startup entirely
+    devices = await asyncio.to_thread(read_devices)
+    if devices is not None:
+        return devices
+    # orjson parses the raw stdout bytes directly, so they are never decoded separately
+    argv = tuple(await _simctl(*_LIST_DEVICES_ARGS))
+    return await _cached_xcrun(argv, DEVICES_TTL, orjson.loads, "Failed to list devices")
 
 @mcp.tool()
 async def boot_device(device_id: str) -> str:
@@ -48,16 +295,8 @@ async def boot_device(device_id: str) -> str:
     Returns:
         str: Success message if the device was booted
     """
-    try:
-        subprocess.run(
-            ["xcrun", "simctl", "boot", device_id],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return f"Successfully booted device {device_id}"
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to boot device: {e.stderr}")
+    await _simctl_run("Failed to boot device", "boot", device_id, changes_devices=True)
+    return f"Successfully booted device {device_id}"
 
 @mcp.tool()
 async def shutdown_device(device_id: str) -> str:
@@ -69,16 +308,8 @@ async def shutdown_device(device_id: str) -> str:
     Returns:
         str: Success message if the device was shutdown
     """
-    try:
-        subprocess.run(
-            ["xcrun", "simctl", "shutdown", device_id],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return f"Successfully shutdown device {device_id}"
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to shutdown device: {e.stderr}")
+    await _simctl_run("Failed to shutdown device", "shutdown", device_id, changes_devices=True)
+    return f"Successfully shutdown device {device_id}"
 
 @mcp.tool()
 async def install_app(device_id: str, app_path: str) -> str:
@@ -91,16 +322,8 @@ async def install_app(device_id: str, app_path: str) -> str:
     Returns:
         str: Success message if the app was installed
     """
-    try:
-        subprocess.run(
-            ["xcrun", "simctl", "install", device_id, app_path],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return f"Successfully installed app at {app_path} on device {device_id}"
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to install app: {e.stderr}")
+    await _simctl_run("Failed to install app", "install", device_id, app_path, changes_devices=True)
+    return f"Successfully installed app at {app_path} on device {device_id}"
 
 @mcp.tool()
 async def launch_app(device_id: str, bundle_id: str) -> str:
@@ -113,18 +336,99 @@ async def launch_app(device_id: str, bundle_id: str) -> str:
     Returns:
         str: Success message if the app was launched
     """
-    try:
-        subprocess.run(
-            ["xcrun", "simctl", "launch", device_id, bundle_id],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return f"Successfully launched app {bundle_id} on device {device_id}"
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to launch app: {e.stderr}")
+    await _simctl_run("Failed to launch app", "launch", device_id, bundle_id)
+    return f"Successfully launched app {bundle_id} on device {device_id}"
+
+
+@mcp.tool()
+async def boot_install_launch(device_id: str, app_path: str, bundle_id: str) -> str:
+    """Boot a simulator device if needed, install an app on it and launch it.
+    
+    Preferred over calling boot_device, install_app and launch_app one by one.
+    
+    Args:
+        device_id (str): The UDID of the simulator device
+        app_path (str): Path to the .app bundle to install
+        bundle_id (str): Bundle identifier of the app to launch
+        
+    Returns:
+        str: Success message if the app was launched
+    """
+    # bootstatus -b boots the device only when it is not already booted and
+    # waits for the boot to finish, so the install cannot race the boot
+    await _simctl_run("Failed to boot device", "bootstatus", device_id, "-b", changes_devices=True)
+    await _simctl_run("Failed to install app", "install", device_id, app_path, changes_devices=True)
+    await _simctl_run("Failed to launch app", "launch", device_id, bundle_id)
+    return f"Successfully installed and launched app {bundle_id} on device {device_id}"
 
 
+@mcp.tool()
+async def boot_device_multi(device_ids: List[str]) -> Dict[str, str]:
+    """Boot several simulator devices concurrently.
+    
+    Args:
+        device_ids (List[str]): The UDIDs of the simulator devices to boot
+        
+    Returns:
+        Dict[str, str]: Success message or error for each device
+    """
+    return await _simctl_fan_out("Failed to boot device", "Successfully booted device",
+                                 "boot", device_ids)
+
+@mcp.tool()
+async def shutdown_device_multi(device_ids: List[str]) -> Dict[str, str]:
+    """Shutdown several simulator devices concurrently.
+    
+    Args:
+        device_ids (List[str]): The UDIDs of the simulator devices to shutdown
+        
+    Returns:
+        Dict[str, str]: Success message or error for each device
+    """
+    return await _simctl_fan_out("Failed to shutdown device", "Successfully shutdown device",
+                                 "shutdown", device_ids)
+
+@mcp.tool()
+async def install_app_multi(device_ids: List[str], app_path: str) -> Dict[str, str]:
+    """Install an app on several simulator devices concurrently.
+    
+    Args:
+        device_ids (List[str]): The UDIDs of the simulator devices
+        app_path (str): Path to the .app bundle to install
+        
+    Returns:
+        Dict[str, str]: Success message or error for each device
+    """
+    return await _simctl_fan_out("Failed to install app", f"Successfully installed app at {app_path} on device",
+                                 "install", device_ids, app_path)
+
+
+async def _list_sdks() -> List[Dict]:
+    # Cached on disk per Xcode install by xcodebuild_list_sdks itself
+    return await asyncio.to_thread(xcodebuild_list_sdks)
+
+
+async def _current_sdk() -> SDK:
+    return await asyncio.to_thread(find_sdk, os.environ.get("SDKROOT", "macosx"))
+
+
+@mcp.tool()
+async def get_sdk_info() -> Dict[str, str]:
+    """Get the name, path, version and platform path of the current SDK in one call.
+    
+    The current SDK is the one named by SDKROOT, or the macOS SDK like xcrun uses by default.
+    
+    Returns:
+        Dict[str, str]: name, path, version and platform_path of the current SDK
+    """
+    sdk = await _current_sdk()
+    return {
+        "name": sdk.name,
+        "path": sdk.path,
+        "version": sdk.version,
+        "platform_path": sdk.platform_path,
+    }
+
 @mcp.tool()
 async def get_sdk_path() -> str:
     """Get the path of the current SDK.
@@ -132,16 +436,7 @@ async def get_sdk_path() -> str:
     Returns:
         str: Path to the current SDK
     """
-    try:
-        result = subprocess.run(
-            ["xcrun", "--show-sdk-path"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to get SDK path: {e.stderr}")
+    return (await _current_sdk()).path
 
 @mcp.tool()
 async def get_sdk_version() -> str:
@@ -150,16 +445,7 @@ async def get_sdk_version() -> str:
     Returns:
         str: Version of the current SDK
     """
-    try:
-        result = subprocess.run(
-            ["xcrun", "--show-sdk-version"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to get SDK version: {e.stderr}")
+    return (await _current_sdk()).version
 
 @mcp.tool()
 async def get_sdk_platform_path() -> str:
@@ -168,16 +454,7 @@ async def get_sdk_platform_path() -> str:
     Returns:
         str: Platform path of the current SDK
     """
-    try:
-        result = subprocess.run(
-            ["xcrun", "--show-sdk-platform-path"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to get SDK platform path: {e.stderr}")
+    return (await _current_sdk()).platform_path
 
 @mcp.tool()
 async def find_developer_tool(tool_name: str) -> str:
@@ -189,16 +466,23 @@ async def find_developer_tool(tool_name: str) -> str:
     Returns:
         str: Full path to the developer tool
     """
-    try:
-        result = subprocess.run(
-            ["xcrun", "-f", tool_name],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to find tool {tool_name}: {e.stderr}")
+    return await asyncio.to_thread(find_tool, tool_name)
+
+@mcp.tool()
+async def reload_developer_tools() -> Dict[str, str]:
+    """Re-resolve developer tool paths, e.g. after switching Xcode with xcode-select.
+    
+    Returns:
+        Dict[str, str]: Resolved paths of the preloaded developer tools
+    """
+    reset_tools()
+    tools = {}
+    for tool_name in DEVELOPER_TOOLS:
+        try:
+            tools[tool_name] = await asyncio.to_thread(find_tool, tool_name)
+        except Exception as e:
+            tools[tool_name] = str(e)
+    return tools
 
 @mcp.tool()
 async def run_tool_with_sdk(tool_name: str, sdk_name: str, *args: str) -> str:
@@ -212,31 +496,24 @@ async def run_tool_with_sdk(tool_name: str, sdk_name: str, *args: str) -> str:
     Returns:
         str: Output from the tool
     """
-    try:
-        cmd = ["xcrun", "--sdk", sdk_name, tool_name] + list(args)
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to run {tool_name} with SDK {sdk_name}: {e.stderr}")
+    cmd = [require_xcrun(), "--sdk", sdk_name, tool_name] + list(args)
+    out = await _xcrun(cmd, f"Failed to run {tool_name} with SDK {sdk_name}")
+    return out.decode('utf-8', 'replace')
 
 @mcp.tool()
 async def xctrace_devices() -> List[Dict]:
     """List available devices for tracing using xctrace."""
-    return xctrace_list_devices()
+    return await asyncio.to_thread(xctrace_list_devices)
 
 @mcp.tool()
 async def xctrace_templates() -> List[Dict]:
     """List available templates for tracing using xctrace."""
-    return list_templates()
+    return await asyncio.to_thread(list_templates)
 
 @mcp.tool()
 async def xctrace_record(template: str, device_id: str, app_bundle_id: str, 
-                      output_path: str, time_limit: Optional[int] = None) -> str:
+                      output_path: str, time_limit: Optional[int] = None,
+                      background: bool = False, ctx: Context = None) -> str:
     """Record app performance using xctrace.
     
     Args:
@@ -245,21 +522,58 @@ async def xctrace_record(template: str, device_id: str, app_bundle_id: str,
         app_bundle_id: Bundle ID of the app to record
         output_path: Path to save the trace file
         time_limit: Optional recording time limit in seconds
+        background: Return a job id right away and poll job_status instead of waiting
     """
-    record(template, device_id, app_bundle_id, output_path, time_limit)
-    return f"Successfully recorded trace to {output_path}"
+    async def job():
+        await record(template, device_id, app_bundle_id, output_path, time_limit)
+        return f"Successfully recorded trace to {output_path}"
+    return await _long_running(job(), ctx, background, time_limit)
 
 @mcp.tool()
-async def xctrace_export(trace_path: str, output_path: str, type: str = "json") -> str:
+async def xctrace_export(trace_path: str, output_path: str, type: str = "json",
+                      compress: bool = False) -> str:
     """Export trace data to specified format.
     
     Args:
         trace_path: Path to the trace file
         output_path: Path to save the exported data
         type: Export format (json, html, etc.)
+        compress: Write zstd-compressed output to output_path + ".zst" (much smaller for JSON)
     """
-    export(trace_path, output_path, type)
-    return f"Successfully exported trace to {output_path}"
+    written_path = await asyncio.to_thread(export, trace_path, output_path, type, compress)
+    return f"Successfully exported trace to {written_path}"
+
+@mcp.tool()
+async def xctrace_export_slice(trace_path: str, xpath: str) -> str:
+    """Export only part of a trace, e.g. a single instrument's table, instead of the whole trace.
+    
+    Args:
+        trace_path: Path to the trace file
+        xpath: XPath into the trace's table of contents
+            (e.g. '/trace-toc/run[@number="1"]/data/table[@schema="time-profile"]')
+    """
+    return await asyncio.to_thread(export_slice, trace_path, xpath)
+
+
+def _check_paging(offset: int, limit: Optional[int]) -> None:
+    # islice would raise a bare ValueError deep inside the worker thread
+    if offset < 0 or (limit is not None and limit < 0):
+        raise Exception("offset and limit must be non-negative")
+
+
+@mcp.tool()
+async def xctrace_export_events(trace_path: str, prefix: str = "events.item", offset: int = 0,
+                                limit: Optional[int] = None) -> List[Any]:
+    """Export a trace as JSON and return its events, parsed incrementally instead of loaded whole.
+    
+    Args:
+        trace_path: Path to the trace file
+        prefix: JSON path of the items to return (e.g. 'events.item')
+        offset: Number of events to skip, for paging through large traces
+        limit: Maximum number of events to return
+    """
+    _check_paging(offset, limit)
+    return await asyncio.to_thread(export_events, trace_path, prefix, offset, limit)
 
 
 @mcp.tool()
@@ -267,7 +581,8 @@ async def xctrace_record_advanced(template: str, device_id: str, app_bundle_id:
                       output_path: str, time_limit: Optional[int] = None,
                       template_options: Optional[Dict[str, str]] = None,
                       launch_args: Optional[List[str]] = None,
-                      env_vars: Optional[Dict[str, str]] = None) -> str:
+                      env_vars: Optional[Dict[str, str]] = None,
+                      background: bool = False, ctx: Context = None) -> str:
     """Advanced record with additional options for template, launch args, and env vars.
     
     Args:
@@ -279,15 +594,19 @@ async def xctrace_record_advanced(template: str, device_id: str, app_bundle_id:
         template_options: Optional template-specific options
         launch_args: Optional launch arguments for the app
         env_vars: Optional environment variables for the app
+        background: Return a job id right away and poll job_status instead of waiting
     """
-    record_with_options(template, device_id, app_bundle_id, output_path, time_limit,
-                       template_options, launch_args, env_vars)
-    return f"Successfully recorded trace to {output_path}"
+    async def job():
+        await record_with_options(template, device_id, app_bundle_id, output_path,
+                                  time_limit, template_options, launch_args, env_vars)
+        return f"Successfully recorded trace to {output_path}"
+    return await _long_running(job(), ctx, background, time_limit)
 
 
 @mcp.tool()
 async def xctrace_attach_process(pid: int, template: str, output_path: str, 
-                              time_limit: Optional[int] = None) -> str:
+                              time_limit: Optional[int] = None,
+                              background: bool = False, ctx: Context = None) -> str:
     """Attach to a running process for tracing.
     
     Args:
@@ -295,9 +614,12 @@ async def xctrace_attach_process(pid: int, template: str, output_path: str,
         template: Name of the template to use
         output_path: Path to save the trace file
         time_limit: Optional recording time limit in seconds
+        background: Return a job id right away and poll job_status instead of waiting
     """
-    attach(pid, template, output_path, time_limit)
-    return f"Successfully attached tracer to process {pid} and saved trace to {output_path}"
+    async def job():
+        await attach(pid, template, output_path, time_limit)
+        return f"Successfully attached tracer to process {pid} and saved trace to {output_path}"
+    return await _long_running(job(), ctx, background, time_limit)
 
 
 @mcp.tool()
@@ -308,7 +630,7 @@ async def xctrace_diagnose(archive_path: str, output_dir: str) -> str:
         archive_path: Path to the trace archive
         output_dir: Directory to save the diagnosis results
     """
-    diagnose_archive(archive_path, output_dir)
+    await asyncio.to_thread(diagnose_archive, archive_path, output_dir)
     return f"Successfully diagnosed archive and saved results to {output_dir}"
 
 
@@ -320,55 +642,87 @@ async def xctrace_document(template: str, output_path: str) -> str:
         template: Name of the template to document
         output_path: Path to save the documentation
     """
-    document_template(template, output_path)
+    await asyncio.to_thread(document_template, template, output_path)
     return f"Successfully generated documentation for template {template} to {output_path}"
 
 
 @mcp.tool()
-async def xctrace_analyze(trace_path: str, output_dir: str) -> str:
+async def xctrace_analyze(trace_path: str, output_dir: str,
+                       background: bool = False, ctx: Context = None) -> str:
     """Analyze a trace file and generate performance reports.
     
     Args:
         trace_path: Path to the trace file
         output_dir: Directory to save analysis reports
+        background: Return a job id right away and poll job_status instead of waiting
     """
-    analyze_trace(trace_path, output_dir)
-    return f"Successfully analyzed trace and saved reports to {output_dir}"
+    async def job():
+        await analyze_trace(trace_path, output_dir)
+        return f"Successfully analyzed trace and saved reports to {output_dir}"
+    return await _long_running(job(), ctx, background)
 
 
 @mcp.tool()
-async def xctrace_compare(base_trace: str, comparison_trace: str, output_path: str) -> str:
+async def xctrace_compare(base_trace: str, comparison_trace: str, output_path: str,
+                       background: bool = False, ctx: Context = None) -> str:
     """Compare two trace files and generate a comparison report.
     
     Args:
         base_trace: Path to the base trace file
         comparison_trace: Path to the comparison trace file
         output_path: Path to save the comparison report
+        background: Return a job id right away and poll job_status instead of waiting
+    """
+    async def job():
+        await compare_traces(base_trace, comparison_trace, output_path)
+        return f"Successfully compared traces and saved report to {output_path}"
+    return await _long_running(job(), ctx, background)
+
+
+@mcp.tool()
+async def xctrace_compare_full(base_trace: str, comparison_trace: str, output_path: str,
+                            export_dir: str, type: str = "json", background: bool = False,
+                            ctx: Context = None) -> str:
+    """Export both traces concurrently, then compare them and generate a comparison report.
+    
+    Args:
+        base_trace: Path to the base trace file
+        comparison_trace: Path to the comparison trace file
+        output_path: Path to save the comparison report
+        export_dir: Directory to save the exports in (as base.<type> and comparison.<type>)
+        type: Export format (json, html, etc.)
+        background: Return a job id right away and poll job_status instead of waiting
     """
-    compare_traces(base_trace, comparison_trace, output_path)
-    return f"Successfully compared traces and saved report to {output_path}"
+    async def job():
+        base_export, comparison_export = await compare_traces_full(
+            base_trace, comparison_trace, output_path, export_dir, type)
+        return (f"Successfully compared traces and saved report to {output_path}\n"
+                f"Exports: {base_export}, {comparison_export}")
+    return await _long_running(job(), ctx, background)
 
 
 # xcrun工具命令
 @mcp.tool()
 async def xcrun_list_sdks() -> List[Dict]:
     """List all available SDKs."""
-    return xcodebuild_list_sdks()
+    return await _list_sdks()
 
 
 @mcp.tool()
-async def xcrun_list_schemes(project_path: str) -> List[str]:
+async def xcrun_list_schemes(project_path: str, fallback: bool = True) -> List[str]:
     """List all schemes in a project.
     
     Args:
         project_path: Path to .xcodeproj or .xcworkspace
+        fallback: Run xcodebuild -list when no scheme files are found (slow, but includes autocreated schemes)
     """
-    return xcodebuild_list_schemes(project_path)
+    return await asyncio.to_thread(xcodebuild_list_schemes, project_path, fallback)
 
 
 @mcp.tool()
 async def xcrun_build(project_path: str, scheme: str, configuration: str = "Debug", 
-                   sdk: str = "iphonesimulator", destination: Optional[str] = None) -> str:
+                   sdk: str = "iphonesimulator", destination: Optional[str] = None,
+                   background: bool = False, ctx: Context = None) -> str:
     """Build an Xcode project.
     
     Args:
@@ -377,9 +731,12 @@ async def xcrun_build(project_path: str, scheme: str, configuration: str = "Debu
         configuration: Build configuration (Debug, Release)
         sdk: SDK to build for
         destination: Optional destination specifier (e.g. 'platform=iOS Simulator,name=iPhone 14')
+        background: Return a job id right away and poll job_status instead of waiting
     """
-    result = xcodebuild_build(project_path, scheme, configuration, sdk, destination)
-    return f"Build completed:\n{result}"
+    async def job():
+        result = await xcodebuild_build(project_path, scheme, configuration, sdk, destination)
+        return f"Build completed:\n{result}"
+    return await _long_running(job(), ctx, background)
 
 
 @mcp.tool()
@@ -391,7 +748,7 @@ async def xcrun_validate_app(app_path: str, username: str, password_keychain_ite
         username: App Store Connect username
         password_keychain_item: Keychain item containing password
     """
-    result = altool_validate_app(app_path, username, password_keychain_item)
+    result = await asyncio.to_thread(altool_validate_app, app_path, username, password_keychain_item)
     return f"App validation completed:\n{result}"
 
 
@@ -404,18 +761,32 @@ async def xcrun_upload_app(app_path: str, username: str, password_keychain_item:
         username: App Store Connect username
         password_keychain_item: Keychain item containing password
     """
-    result = altool_upload_app(app_path, username, password_keychain_item)
+    result = await asyncio.to_thread(altool_upload_app, app_path, username, password_keychain_item)
     return f"App upload completed:\n{result}"
 
 
 @mcp.tool()
-async def xcrun_swift_symbols(binary_path: str) -> List[str]:
+async def xcrun_swift_symbols(binary_path: str, offset: int = 0,
+                              limit: Optional[int] = None) -> List[str]:
     """Extract Swift symbols from a binary.
     
     Args:
         binary_path: Path to binary file
+        offset: Number of lines to skip, for paging through large outputs
+        limit: Maximum number of lines to return
     """
-    return swift_symbols(binary_path)
+    _check_paging(offset, limit)
+    return await asyncio.to_thread(swift_symbols, binary_path, offset, limit)
+
+
+@mcp.tool()
+async def xcrun_swift_symbols_batch(binary_paths: List[str]) -> Dict[str, List[str]]:
+    """Demangle the exported Swift symbols of several binaries in one pass.
+    
+    Args:
+        binary_paths: Paths to binary files
+    """
+    return await asyncio.to_thread(swift_symbols_batch, binary_paths)
 
 
 @mcp.tool()
@@ -425,27 +796,56 @@ async def xcrun_otool_headers(binary_path: str) -> List[str]:
     Args:
         binary_path: Path to binary file
     """
-    return otool_headers(binary_path)
+    return await asyncio.to_thread(otool_headers, binary_path)
 
 
 @mcp.tool()
-async def xcrun_otool_libraries(binary_path: str) -> List[str]:
+async def xcrun_otool_libraries(binary_path: str, offset: int = 0,
+                                limit: Optional[int] = None) -> List[str]:
     """Show linked libraries of a binary.
     
     Args:
         binary_path: Path to binary file
+        offset: Number of lines to skip, for paging through large outputs
+        limit: Maximum number of lines to return
     """
-    return otool_libraries(binary_path)
+    _check_paging(offset, limit)
+    return await asyncio.to_thread(otool_libraries, binary_path, offset, limit)
 
 
 @mcp.tool()
-async def xcrun_nm_symbols(binary_path: str) -> List[str]:
+async def xcrun_nm_symbols(binary_path: str, names_only: bool = False, offset: int = 0,
+                           limit: Optional[int] = None) -> List[str]:
     """Show symbols in a binary.
     
     Args:
         binary_path: Path to binary file
+        names_only: Only list symbol names, without addresses and types (much smaller output)
+        offset: Number of lines to skip, for paging through large outputs
+        limit: Maximum number of lines to return
+    """
+    _check_paging(offset, limit)
+    return await asyncio.to_thread(nm_symbols, binary_path, names_only, offset, limit)
+
+
+@mcp.tool()
+async def xcrun_inspect_binary(binary_path: str) -> Dict[str, List[str]]:
+    """Show headers, linked libraries, symbols and Swift symbols of a binary in one call.
+    
+    Args:
+        binary_path: Path to binary file
+    """
+    return await asyncio.to_thread(inspect_binary, binary_path)
+
+
+@mcp.tool()
+async def xcrun_batch_otool_libraries(binary_paths: List[str]) -> Dict[str, List[str]]:
+    """Show linked libraries of several binaries.
+    
+    Args:
+        binary_paths: Paths to binary files
     """
-    return nm_symbols(binary_path)
+    return await asyncio.to_thread(batch_otool_libraries, binary_paths)
 
 
 if __name__ == "__main__":
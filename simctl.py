@@ -0,0 +1,102 @@
+"""
+Direct readers for CoreSimulator state.
+Reads the simulator device set from disk instead of starting xcrun simctl.
+"""
+import glob
+import os
+import plistlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+DEVICES_DIR = os.path.expanduser("~/Library/Developer/CoreSimulator/Devices")
+LOGS_DIR = os.path.expanduser("~/Library/Logs/CoreSimulator")
+
+RUNTIME_DIRS = [
+    "/Library/Developer/CoreSimulator/Profiles/Runtimes",
+    os.path.expanduser("~/Library/Developer/CoreSimulator/Profiles/Runtimes"),
+    # Runtimes installed as disk images (Xcode 14+) are mounted here
+    "/Library/Developer/CoreSimulator/Volumes/*/Library/Developer/CoreSimulator/Profiles/Runtimes",
+]
+
+# SimDevice state values as stored in device.plist
+_STATES = {
+    0: "Creating",
+    1: "Shutdown",
+    2: "Booting",
+    3: "Booted",
+    4: "Shutting Down",
+}
+
+
+def _runtime_identifiers() -> set:
+    """Collect the bundle identifiers of all installed and usable simulator runtimes."""
+    identifiers = set()
+    for pattern in RUNTIME_DIRS:
+        for bundle in glob.glob(os.path.join(pattern, "*.simruntime")):
+            # A bundle without its root file system (e.g. a partial download)
+            # cannot boot devices, so simctl would report them unavailable
+            if not os.path.isdir(os.path.join(bundle, "Contents", "Resources", "RuntimeRoot")):
+                continue
+            try:
+                with open(os.path.join(bundle, "Contents", "Info.plist"), "rb") as f:
+                    identifiers.add(plistlib.load(f)["CFBundleIdentifier"])
+            except (OSError, KeyError, plistlib.InvalidFileException):
+                continue
+    return identifiers
+
+
+def read_devices() -> Optional[Dict[str, Any]]:
+    """Read the default simulator device set from disk.
+
+    Returns the same shape as `xcrun simctl list devices --json`
+    ({"devices": {runtime: [device, ...]}}) with the fields needed to address
+    a device: udid, name, state, isAvailable, deviceTypeIdentifier, dataPath
+    and logPath (plus lastBootedAt when known).
+
+    Returns:
+        Optional[Dict[str, Any]]: Device list, or None when the device set
+        cannot be read reliably and simctl should be asked instead
+    """
+    try:
+        entries = sorted(os.scandir(DEVICES_DIR), key=lambda e: e.name)
+    except OSError:
+        return None
+
+    runtimes = _runtime_identifiers()
+    # simctl lists every installed runtime, including ones without devices
+    devices: Dict[str, List[Dict[str, Any]]] = {runtime: [] for runtime in sorted(runtimes)}
+
+    for entry in entries:
+        if not entry.is_dir():
+            continue
+        try:
+            with open(os.path.join(entry.path, "device.plist"), "rb") as f:
+                info = plistlib.load(f)
+        except FileNotFoundError:
+            continue
+        except (OSError, plistlib.InvalidFileException):
+            return None
+
+        state = _STATES.get(info.get("state"))
+        runtime = info.get("runtime")
+        # Availability of runtimes we cannot locate (e.g. bundled inside an
+        # older Xcode, or removed) is only known to simctl, so isAvailable
+        # below is only ever claimed for a runtime bundle found on disk
+        if state is None or runtime not in runtimes:
+            return None
+
+        device = {
+            "dataPath": os.path.join(entry.path, "data"),
+            "logPath": os.path.join(LOGS_DIR, info.get("UDID", entry.name)),
+            "udid": info.get("UDID", entry.name),
+            "isAvailable": True,
+            "deviceTypeIdentifier": info.get("deviceType"),
+            "state": state,
+            "name": info.get("name"),
+        }
+        if isinstance(info.get("lastBootedAt"), datetime):
+            device["lastBootedAt"] = info["lastBootedAt"].strftime("%Y-%m-%dT%H:%M:%SZ")
+        devices[runtime].append(device)
+
+    return {"devices": devices}
@@ -2,37 +2,371 @@
 MCP tools for xcrun command wrappers.
 Common xcrun operations for Xcode development.
 """
-import json
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import getpass
+import itertools
+import os
+import plistlib
+import shutil
 import subprocess
-from typing import List, Dict, Optional, Union, Any
+import tempfile
+from typing import List, Dict, Iterator, Optional, Tuple
+import xml.etree.ElementTree as ET
+import orjson
+import cache
 
 
+# Tools resolved at server startup so later calls can run them without the xcrun dispatcher
+DEVELOPER_TOOLS = ['simctl', 'xctrace', 'xcodebuild', 'otool', 'nm', 'swift-demangle', 'altool']
+TOOL_TTL = 3600
+
+# tool name -> absolute path, frozen for the lifetime of the process
+_TOOLS: Dict[str, str] = {}
+
+# Looked up once: without Xcode (or off macOS) every call fails fast instead of
+# searching PATH and attempting to spawn xcrun again
+XCRUN_PATH = shutil.which('xcrun')
+
+
+def require_xcrun() -> str:
+    """Return the absolute path of xcrun, raising if it is not installed."""
+    if XCRUN_PATH is None:
+        raise Exception("xcrun not found")
+    return XCRUN_PATH
+
+
+def _xcrun_find(tool_name: str) -> str:
+    # The answer is a single short path: strip the raw bytes and decode only
+    # what is left, and decode stderr only when there is an error to report
+    result = subprocess.run([require_xcrun(), '-f', tool_name], capture_output=True,
+                            stdin=subprocess.DEVNULL, env=xcrun_env(), close_fds=False)
+    if result.returncode != 0:
+        raise Exception(f"Failed to find tool {tool_name}: {result.stderr.decode('utf-8', 'replace')}")
+    return result.stdout.strip().decode()
+
+
+def find_tool(tool_name: str) -> str:
+    """Find the absolute path of a developer tool.
+    
+    The path is resolved through `xcrun -f` once and then served from memory
+    (and from the on-disk cache across restarts, per developer dir and Xcode version).
+    
+    Args:
+        tool_name: Name of the developer tool to find
+    """
+    path = _TOOLS.get(tool_name)
+    if path is None:
+        key = xcode_key(f'xcrun -f {tool_name}')
+        if key is None:
+            path = _xcrun_find(tool_name)
+        else:
+            path = cache.memoize(key, TOOL_TTL, _xcrun_find, tool_name)
+        _TOOLS[tool_name] = path
+    return path
+
+
+def preload_tools(tool_names: List[str] = DEVELOPER_TOOLS) -> None:
+    """Resolve the given developer tools ahead of their first use.
+    
+    Args:
+        tool_names: Names of the developer tools to resolve
+    """
+    for tool_name in tool_names:
+        try:
+            find_tool(tool_name)
+        except Exception:
+            # Not installed (or no Xcode at all); reported when the tool is first used
+            pass
+
+
+def reset_tools() -> None:
+    """Forget all resolved tool paths, e.g. after switching Xcode with xcode-select."""
+    # Worker threads may be resolving tools concurrently
+    for tool_name in list(_TOOLS):
+        key = xcode_key(f'xcrun -f {tool_name}')
+        if key is not None:
+            cache.evict(key)
+    _TOOLS.clear()
+    developer_dir.cache_clear()
+    xcode_version.cache_clear()
+    xcrun_env.cache_clear()
+
+
+@functools.lru_cache(maxsize=None)
+def developer_dir() -> str:
+    """Return the active developer directory (DEVELOPER_DIR or `xcode-select -p`)."""
+    path = os.environ.get('DEVELOPER_DIR')
+    if path:
+        return path
+    try:
+        result = subprocess.run(['/usr/bin/xcode-select', '-p'], capture_output=True,
+                                stdin=subprocess.DEVNULL, close_fds=False)
+    except OSError:
+        return ''
+    return result.stdout.strip().decode() if result.returncode == 0 else ''
+
+
+@functools.lru_cache(maxsize=None)
+def xcode_version() -> str:
+    """Return the version and build of the active Xcode (e.g. '15.2 (15C500b)'), or '' if unknown."""
+    dev_dir = developer_dir()
+    if not dev_dir:
+        return ''
+    try:
+        with open(os.path.join(dev_dir, '..', 'version.plist'), 'rb') as f:
+            info = plistlib.load(f)
+    except (OSError, plistlib.InvalidFileException):
+        return ''
+    return f"{info.get('CFBundleShortVersionString', '')} ({info.get('ProductBuildVersion', '')})"
+
+
+def xcode_key(name: str) -> Optional[Tuple]:
+    """Cache key for results that only change with the active Xcode install.
+    
+    Args:
+        name: Name of the cached command
+    """
+    dev_dir = developer_dir()
+    if not dev_dir:
+        return None
+    return (name, dev_dir, xcode_version())
+
+
+@functools.lru_cache(maxsize=None)
+def xcrun_env() -> Dict[str, str]:
+    """Environment for Xcode tool child processes, with DEVELOPER_DIR pinned.
+    
+    Setting DEVELOPER_DIR explicitly spares every xcrun invocation its own
+    xcode-select lookup. The returned dict is shared and must not be modified.
+    """
+    env = dict(os.environ)
+    dev_dir = developer_dir()
+    if dev_dir:
+        env['DEVELOPER_DIR'] = dev_dir
+    return env
+
+
+def run_json(cmd: List[str], error: str):
+    """Run a command printing JSON and return the parsed output.
+    
+    Args:
+        cmd: Command to run
+        error: Message prefix for the exception raised on failure
+    """
+    result = subprocess.run(cmd, capture_output=True, stdin=subprocess.DEVNULL,
+                            env=xcrun_env(), close_fds=False)
+    if result.returncode != 0:
+        raise Exception(f"{error}: {result.stderr.decode('utf-8', 'replace')}")
+    return orjson.loads(result.stdout)
+
+
+async def run_async(cmd: List[str], error: str) -> bytes:
+    """Run a long command on the event loop and return its stdout.
+    
+    No worker thread is held while the command runs, and the child is killed
+    when the calling task is cancelled.
+    
+    Args:
+        cmd: Command to run, starting with an absolute tool path
+        error: Message prefix for the exception raised on failure
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=xcrun_env(),
+        close_fds=False
+    )
+    try:
+        out, err = await proc.communicate()
+    except asyncio.CancelledError:
+        proc.kill()
+        await proc.wait()
+        raise
+    if proc.returncode != 0:
+        raise Exception(f"{error}: {err.decode('utf-8', 'replace')}")
+    return out
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def _sdks_key() -> Optional[Tuple]:
+    dev_dir = developer_dir()
+    if not dev_dir:
+        return None
+    # Xcode updates replace version.plist; installing platform SDKs touches Platforms
+    return ('xcodebuild -showsdks', dev_dir,
+            _mtime(os.path.join(dev_dir, '..', 'version.plist')),
+            _mtime(os.path.join(dev_dir, 'Platforms')))
+
+
+def _schemes_key(project_path: str, fallback: bool = True) -> Optional[Tuple]:
+    if project_path.endswith('.xcworkspace'):
+        main_file = os.path.join(project_path, 'contents.xcworkspacedata')
+    else:
+        main_file = os.path.join(project_path, 'project.pbxproj')
+    try:
+        main_mtime = os.path.getmtime(main_file)
+    except OSError:
+        return None
+    mtimes = [_mtime(d) for d in _scheme_dirs(project_path)]
+    if project_path.endswith('.xcworkspace'):
+        # Member projects contribute their schemes, and their pbxproj to the xcodebuild fallback
+        try:
+            members = _workspace_projects(project_path)
+        except (OSError, ET.ParseError):
+            members = []
+        for member in members:
+            mtimes.append(_mtime(os.path.join(member, 'project.pbxproj')))
+            mtimes.extend(_mtime(d) for d in _scheme_dirs(member))
+    return ('xcodebuild -list', os.path.abspath(project_path), fallback, main_mtime, *mtimes)
+
+
+def _scheme_dirs(container_path: str) -> List[str]:
+    """Directories holding the shared and current user's schemes of a project or workspace."""
+    return [
+        os.path.join(container_path, 'xcshareddata', 'xcschemes'),
+        os.path.join(container_path, 'xcuserdata', f"{getpass.getuser()}.xcuserdatad", 'xcschemes'),
+    ]
+
+
+def _workspace_projects(workspace_path: str) -> List[str]:
+    """Paths of the projects referenced by a workspace's contents.xcworkspacedata."""
+    root = ET.parse(os.path.join(workspace_path, 'contents.xcworkspacedata')).getroot()
+    projects = []
+
+    def resolve(location: str, base: str) -> str:
+        kind, _, path = location.partition(':')
+        if kind == 'absolute':
+            return path
+        if kind == 'container':
+            return os.path.join(os.path.dirname(workspace_path), path)
+        # group: (and self:) are relative to the enclosing group
+        return os.path.join(base, path)
+
+    def walk(element, base: str) -> None:
+        for child in element:
+            location = child.get('location', '')
+            if child.tag == 'Group':
+                walk(child, resolve(location, base) if location else base)
+            elif child.tag == 'FileRef' and location.endswith('.xcodeproj'):
+                projects.append(resolve(location, base))
+
+    walk(root, os.path.dirname(workspace_path))
+    return projects
+
+
+def _fast_list_schemes(project_path: str) -> List[str]:
+    """List schemes by reading .xcscheme files instead of running xcodebuild.
+    
+    Only finds schemes saved on disk (shared or the current user's); schemes
+    xcodebuild would autocreate for a project without any are not listed.
+    
+    Args:
+        project_path: Path to .xcodeproj or .xcworkspace
+    """
+    containers = [project_path]
+    if project_path.endswith('.xcworkspace'):
+        containers += _workspace_projects(project_path)
+
+    schemes = set()
+    for container in containers:
+        for schemes_dir in _scheme_dirs(container):
+            try:
+                names = os.listdir(schemes_dir)
+            except OSError:
+                continue
+            schemes.update(name[:-len('.xcscheme')] for name in names if name.endswith('.xcscheme'))
+    return sorted(schemes)
+
+
+@cache.cached(_sdks_key)
 def xcodebuild_list_sdks() -> List[Dict]:
     """List all available SDKs."""
-    try:
-        result = subprocess.run(['xcrun', 'xcodebuild', '-showsdks', '-json'],
-                              capture_output=True, text=True, check=True)
-        return json.loads(result.stdout)
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to list SDKs: {e.stderr}")
+    return run_json([find_tool('xcodebuild'), '-showsdks', '-json'], "Failed to list SDKs")
+
+
+@dataclass(frozen=True, slots=True)
+class SDK:
+    """An SDK as listed by `xcodebuild -showsdks -json`."""
+    name: str
+    path: str
+    version: str
+    platform: str
+    platform_path: str
+
+    @classmethod
+    def from_json(cls, sdk: Dict) -> 'SDK':
+        return cls(
+            name=sdk.get('canonicalName'),
+            path=sdk.get('sdkPath'),
+            version=sdk.get('sdkVersion'),
+            platform=sdk.get('platform'),
+            platform_path=sdk.get('platformPath'),
+        )
+
 
+# (SDKROOT value, SDK list cache key) -> SDK picked from that list
+_SDK_MATCHES: Dict[Tuple, SDK] = {}
 
-def xcodebuild_list_schemes(project_path: str) -> List[str]:
+
+def find_sdk(sdk_root: str) -> SDK:
+    """Find the newest SDK matching an SDKROOT-style value.
+    
+    Args:
+        sdk_root: SDK canonical name, platform or path (e.g. 'iphoneos17.2', 'macosx')
+    """
+    key = _sdks_key()
+    sdk = _SDK_MATCHES.get((sdk_root, key)) if key is not None else None
+    if sdk is None:
+        matches = [sdk for sdk in xcodebuild_list_sdks()
+                   if sdk_root in (sdk.get('canonicalName'), sdk.get('platform'), sdk.get('sdkPath'))]
+        if not matches:
+            raise Exception(f"Failed to get SDK info: no SDK matches {sdk_root}")
+        # xcodebuild lists SDKs oldest first
+        sdk = SDK.from_json(matches[-1])
+        if key is not None:
+            _SDK_MATCHES[(sdk_root, key)] = sdk
+    return sdk
+
+
+@cache.cached(_schemes_key)
+def xcodebuild_list_schemes(project_path: str, fallback: bool = True) -> List[str]:
     """List all schemes in a project.
     
+    Scheme files are read directly; xcodebuild -list (which takes seconds) is
+    only run when none are found on disk.
+    
     Args:
         project_path: Path to .xcodeproj or .xcworkspace
+        fallback: Ask xcodebuild when no scheme files are found
     """
     try:
-        result = subprocess.run(['xcrun', 'xcodebuild', '-list', '-project', project_path, '-json'],
-                              capture_output=True, text=True, check=True)
-        data = json.loads(result.stdout)
-        return data.get('project', {}).get('schemes', [])
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to list schemes: {e.stderr}")
+        schemes = _fast_list_schemes(project_path)
+    except (OSError, ET.ParseError):
+        schemes = []
+    if schemes or not fallback:
+        return schemes
+
+    if project_path.endswith('.xcworkspace'):
+        container_flag, container_key = '-workspace', 'workspace'
+    else:
+        container_flag, container_key = '-project', 'project'
+    data = run_json([find_tool('xcodebuild'), '-list', container_flag, project_path, '-json'],
+                    "Failed to list schemes")
+    return data.get(container_key, {}).get('schemes', [])
 
 
-def xcodebuild_build(project_path: str, scheme: str, configuration: str = "Debug", 
+async def xcodebuild_build(project_path: str, scheme: str, configuration: str = "Debug", 
                    sdk: str = "iphonesimulator", destination: Optional[str] = None) -> str:
     """Build an Xcode project.
     
@@ -44,7 +378,7 @@ def xcodebuild_build(project_path: str, scheme: str, configuration: str = "Debug
         destination: Optional destination specifier (e.g. 'platform=iOS Simulator,name=iPhone 14')
     """
     cmd = [
-        'xcrun', 'xcodebuild',
+        await asyncio.to_thread(find_tool, 'xcodebuild'),
         '-project', project_path,
         '-scheme', scheme,
         '-configuration', configuration,
@@ -54,11 +388,11 @@ def xcodebuild_build(project_path: str, scheme: str, configuration: str = "Debug
     if destination:
         cmd.extend(['-destination', destination])
         
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Build failed: {e.stderr}")
+    out = await run_async(cmd, "Build failed")
+    # A build may regenerate the project (e.g. XcodeGen/Tuist build phases);
+    # this drops the cached schemes for both fallback values
+    await asyncio.to_thread(xcodebuild_list_schemes.cache_evict, project_path)
+    return out.decode('utf-8', 'replace')
 
 
 def altool_validate_app(app_path: str, username: str, password_keychain_item: str) -> str:
@@ -69,16 +403,15 @@ def altool_validate_app(app_path: str, username: str, password_keychain_item: st
         username: App Store Connect username
         password_keychain_item: Keychain item containing password
     """
-    try:
-        result = subprocess.run([
-            'xcrun', 'altool', '--validate-app',
-            '-f', app_path,
-            '-u', username,
-            '-p', f"@keychain:{password_keychain_item}"
-        ], capture_output=True, text=True, check=True)
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"App validation failed: {e.stderr}")
+    result = subprocess.run([
+        find_tool('altool'), '--validate-app',
+        '-f', app_path,
+        '-u', username,
+        '-p', f"@keychain:{password_keychain_item}"
+    ], capture_output=True, stdin=subprocess.DEVNULL, env=xcrun_env(), close_fds=False)
+    if result.returncode != 0:
+        raise Exception(f"App validation failed: {result.stderr.decode('utf-8', 'replace')}")
+    return result.stdout.decode('utf-8', 'replace')
 
 
 def altool_upload_app(app_path: str, username: str, password_keychain_item: str) -> str:
@@ -89,30 +422,113 @@ def altool_upload_app(app_path: str, username: str, password_keychain_item: str)
         username: App Store Connect username
         password_keychain_item: Keychain item containing password
     """
+    result = subprocess.run([
+        find_tool('altool'), '--upload-app',
+        '-f', app_path,
+        '-u', username,
+        '-p', f"@keychain:{password_keychain_item}"
+    ], capture_output=True, stdin=subprocess.DEVNULL, env=xcrun_env(), close_fds=False)
+    if result.returncode != 0:
+        raise Exception(f"App upload failed: {result.stderr.decode('utf-8', 'replace')}")
+    return result.stdout.decode('utf-8', 'replace')
+
+
+def _iter_lines(cmd: List[str], error: str) -> Iterator[str]:
+    """Run a command and yield its stdout line by line as it is produced.
+    
+    Lines are decoded one at a time from the pipe, so the whole output never
+    exists as a single string. Closing the iterator early kills the command.
+    stderr is spooled to a temporary file so a chatty command cannot fill the
+    stderr pipe and stall while stdout is being read.
+    
+    Args:
+        cmd: Command to run
+        error: Message prefix for the exception raised on failure
+    """
+    with tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=err,
+                                env=xcrun_env(), close_fds=False, bufsize=1024 * 1024,
+                                encoding='utf-8', errors='replace')
+        with proc:
+            try:
+                for line in proc.stdout:
+                    yield line.rstrip('\n')
+            except GeneratorExit:
+                proc.kill()
+                raise
+        if proc.returncode != 0:
+            err.seek(0)
+            raise Exception(f"{error}: {err.read().decode('utf-8', 'replace')}")
+
+
+def _output_lines(cmd: List[str], error: str, offset: int = 0,
+                  limit: Optional[int] = None) -> List[str]:
+    """Run a command and return a window of its stdout lines.
+    
+    Lines before the window are skipped as they stream by, and the command is
+    stopped as soon as the window is full.
+    
+    Args:
+        cmd: Command to run
+        error: Message prefix for the exception raised on failure
+        offset: Number of lines to skip
+        limit: Maximum number of lines to return (all remaining lines if None)
+    """
+    stop = None if limit is None else offset + limit
+    lines = _iter_lines(cmd, error)
     try:
-        result = subprocess.run([
-            'xcrun', 'altool', '--upload-app',
-            '-f', app_path,
-            '-u', username,
-            '-p', f"@keychain:{password_keychain_item}"
-        ], capture_output=True, text=True, check=True)
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"App upload failed: {e.stderr}")
-
-
-def swift_symbols(binary_path: str) -> List[str]:
+        return list(itertools.islice(lines, offset, stop))
+    finally:
+        lines.close()
+
+
+def swift_symbols(binary_path: str, offset: int = 0, limit: Optional[int] = None) -> List[str]:
     """Extract Swift symbols from a binary.
     
     Args:
         binary_path: Path to binary file
+        offset: Number of lines to skip
+        limit: Maximum number of lines to return
     """
-    try:
-        result = subprocess.run(['xcrun', 'swift-demangle', binary_path],
-                              capture_output=True, text=True, check=True)
-        return result.stdout.splitlines()
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to extract symbols: {e.stderr}")
+    return _output_lines([find_tool('swift-demangle'), binary_path], "Failed to extract symbols",
+                         offset, limit)
+
+
+def swift_symbols_batch(binary_paths: List[str]) -> Dict[str, List[str]]:
+    """Demangle the exported symbols of several binaries with a single swift-demangle process.
+    
+    Symbol names are collected with `nm -gUj`, then piped through one
+    swift-demangle separated by per-binary marker lines (swift-demangle passes
+    text that is not a mangled name through unchanged).
+    
+    Args:
+        binary_paths: Paths to binary files
+    """
+    # A binary listed twice is scanned once; its markers would otherwise clash
+    binary_paths = list(dict.fromkeys(binary_paths))
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(binary_paths)))) as executor:
+        symbol_lists = list(executor.map(
+            lambda path: _output_lines([find_tool('nm'), '-gUj', path], "Failed to show symbols"),
+            binary_paths))
+    
+    markers = [f"@@mcpxcode-binary-{index}@@" for index in range(len(binary_paths))]
+    payload = ''.join(f"{marker}\n" + ''.join(f"{symbol}\n" for symbol in symbols)
+                      for marker, symbols in zip(markers, symbol_lists))
+    result = subprocess.run([find_tool('swift-demangle')], input=payload,
+                            capture_output=True, encoding='utf-8', errors='replace',
+                            env=xcrun_env(), close_fds=False)
+    if result.returncode != 0:
+        raise Exception(f"Failed to extract symbols: {result.stderr}")
+    
+    paths_by_marker = dict(zip(markers, binary_paths))
+    demangled: Dict[str, List[str]] = {path: [] for path in binary_paths}
+    current = None
+    for line in result.stdout.splitlines():
+        if line in paths_by_marker:
+            current = demangled[paths_by_marker[line]]
+        elif current is not None:
+            current.append(line)
+    return demangled
 
 
 def otool_headers(binary_path: str) -> List[str]:
@@ -121,37 +537,83 @@ def otool_headers(binary_path: str) -> List[str]:
     Args:
         binary_path: Path to binary file
     """
-    try:
-        result = subprocess.run(['xcrun', 'otool', '-h', binary_path],
-                              capture_output=True, text=True, check=True)
-        return result.stdout.splitlines()
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to show headers: {e.stderr}")
+    return _output_lines([find_tool('otool'), '-h', binary_path], "Failed to show headers")
 
 
-def otool_libraries(binary_path: str) -> List[str]:
+def otool_libraries(binary_path: str, offset: int = 0, limit: Optional[int] = None) -> List[str]:
     """Show linked libraries of a binary.
     
     Args:
         binary_path: Path to binary file
+        offset: Number of lines to skip
+        limit: Maximum number of lines to return
     """
-    try:
-        result = subprocess.run(['xcrun', 'otool', '-L', binary_path],
-                              capture_output=True, text=True, check=True)
-        return result.stdout.splitlines()
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to show linked libraries: {e.stderr}")
+    return _output_lines([find_tool('otool'), '-L', binary_path], "Failed to show linked libraries",
+                         offset, limit)
+
 
+def _nm_command(binary_path: str, names_only: bool) -> List[str]:
+    cmd = [find_tool('nm')]
+    if names_only:
+        cmd.append('-j')
+    cmd.append(binary_path)
+    return cmd
 
-def nm_symbols(binary_path: str) -> List[str]:
+
+def nm_symbols_iter(binary_path: str, names_only: bool = False) -> Iterator[str]:
+    """Yield the symbols of a binary one line at a time as nm prints them.
+    
+    Closing the iterator early stops nm.
+    
+    Args:
+        binary_path: Path to binary file
+        names_only: Only list symbol names, without addresses and types (nm -j)
+    """
+    return _iter_lines(_nm_command(binary_path, names_only), "Failed to show symbols")
+
+
+def nm_symbols(binary_path: str, names_only: bool = False, offset: int = 0,
+               limit: Optional[int] = None) -> List[str]:
     """Show symbols in a binary.
     
+    Builds the whole window as a list; code walking all symbols of a large
+    binary should use nm_symbols_iter() instead.
+    
     Args:
         binary_path: Path to binary file
+        names_only: Only list symbol names, without addresses and types (nm -j)
+        offset: Number of lines to skip
+        limit: Maximum number of lines to return
     """
-    try:
-        result = subprocess.run(['xcrun', 'nm', binary_path],
-                              capture_output=True, text=True, check=True)
-        return result.stdout.splitlines()
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to show symbols: {e.stderr}")
+    return _output_lines(_nm_command(binary_path, names_only), "Failed to show symbols",
+                         offset, limit)
+
+
+def inspect_binary(binary_path: str) -> Dict[str, List[str]]:
+    """Collect headers, linked libraries, symbols and Swift symbols of a binary at once.
+    
+    The four tools run concurrently (threads only wait on the child processes),
+    so this takes as long as the slowest of them instead of their sum.
+    
+    Args:
+        binary_path: Path to binary file
+    """
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = {
+            'headers': executor.submit(otool_headers, binary_path),
+            'libraries': executor.submit(otool_libraries, binary_path),
+            'symbols': executor.submit(nm_symbols, binary_path),
+            'swift_symbols': executor.submit(swift_symbols, binary_path),
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+def batch_otool_libraries(binary_paths: List[str], max_workers: int = 8) -> Dict[str, List[str]]:
+    """Show linked libraries of several binaries concurrently.
+    
+    Args:
+        binary_paths: Paths to binary files
+        max_workers: Maximum number of otool processes running at once
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(binary_paths)))) as executor:
+        return dict(zip(binary_paths, executor.map(otool_libraries, binary_paths)))
@@ -2,33 +2,59 @@
 MCP tools for xctrace command wrappers.
 Common xctrace operations for performance profiling and debugging.
 """
-import json
+import asyncio
+import hashlib
+import itertools
 import subprocess
 import os
-from typing import List, Dict, Optional, Union, Any
+import plistlib
+import shutil
+import tempfile
+from typing import Any, Callable, Iterator, List, Dict, Optional, Tuple
+import ijson
+import zstandard
+import cache
+from xcrun import developer_dir, find_tool, run_async, run_json, xcrun_env, xcode_key, xcode_version
 
 
+# Trace devices come and go as they are plugged in; templates only change with Xcode
+DEVICES_TTL = 5
+
+
+@cache.cached(lambda: xcode_key('xctrace list devices'), DEVICES_TTL)
 def list_devices() -> List[Dict]:
     """List available devices for tracing."""
+    return run_json([find_tool('xctrace'), 'list', 'devices', '--json'], "Failed to list devices")
+
+
+# Custom templates saved from Instruments are listed alongside the built-in ones
+USER_TEMPLATES_DIR = os.path.expanduser("~/Library/Application Support/Instruments/Templates")
+
+
+def _templates_key():
+    dev_dir = developer_dir()
+    if not dev_dir:
+        return None
+    try:
+        with open(os.path.join(dev_dir, '..', 'Applications', 'Instruments.app',
+                               'Contents', 'Info.plist'), 'rb') as f:
+            instruments_version = plistlib.load(f).get('CFBundleVersion', '')
+    except (OSError, plistlib.InvalidFileException):
+        instruments_version = ''
     try:
-        result = subprocess.run(['xctrace', 'list', 'devices', '--json'],
-                              capture_output=True, text=True, check=True)
-        return json.loads(result.stdout)
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to list devices: {e.stderr}")
+        user_templates_mtime = os.path.getmtime(USER_TEMPLATES_DIR)
+    except OSError:
+        user_templates_mtime = 0.0
+    return xcode_key('xctrace list templates') + (instruments_version, user_templates_mtime)
 
 
+@cache.cached(_templates_key)
 def list_templates() -> List[Dict]:
     """List available templates for tracing."""
-    try:
-        result = subprocess.run(['xctrace', 'list', 'templates', '--json'],
-                              capture_output=True, text=True, check=True)
-        return json.loads(result.stdout)
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to list templates: {e.stderr}")
+    return run_json([find_tool('xctrace'), 'list', 'templates', '--json'], "Failed to list templates")
 
 
-def record(template: str, device_id: str, app_bundle_id: str, 
+async def record(template: str, device_id: str, app_bundle_id: str, 
           output_path: str, time_limit: Optional[int] = None) -> None:
     """
     Record app performance using specified template.
@@ -40,24 +66,153 @@ def record(template: str, device_id: str, app_bundle_id: str,
         output_path: Path to save the trace file
         time_limit: Optional recording time limit in seconds
     """
-    cmd = [
-        'xctrace', 'record',
-        '--template', template,
-        '--device', device_id,
-        '--target', app_bundle_id,
-        '--output', output_path
-    ]
+    await record_with_options(template, device_id, app_bundle_id, output_path, time_limit)
+
+
+# Outputs of export/analyze, reused while the trace and the arguments are unchanged
+TRACE_CACHE_DIR = os.path.join(cache.CACHE_DIR, "xctrace")
+
+# Least recently used entries are dropped once the cached outputs exceed this size
+TRACE_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+
+def _trace_key(trace_path: str) -> Optional[str]:
+    # A .trace is a bundle: its own stat plus the stat of its top-level entries
+    # changes whenever a run is added or rewritten, without hashing the contents
+    try:
+        st = os.stat(trace_path)
+        parts = [os.path.realpath(trace_path), st.st_mtime_ns, st.st_size]
+        if os.path.isdir(trace_path):
+            for entry in sorted(os.scandir(trace_path), key=lambda e: e.name):
+                entry_st = entry.stat()
+                parts.append((entry.name, entry_st.st_mtime_ns, entry_st.st_size))
+    except OSError:
+        return None
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+def _copy_output(src: str, dst: str) -> None:
+    if os.path.isdir(src):
+        shutil.copytree(src, dst, dirs_exist_ok=True)
+    else:
+        shutil.copy2(src, dst)
+
+
+# mkstemp creates files as 0600; outputs moved into place get the usual permissions
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _temp_beside(path: str):
+    """Open a temporary binary file in path's directory, to be os.replace()d onto path."""
+    f = tempfile.NamedTemporaryFile(dir=os.path.dirname(path) or '.', prefix='.mcpxcode-', delete=False)
+    os.chmod(f.name, 0o666 & ~_UMASK)
+    return f
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _tree_size(path: str) -> int:
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    total = 0
+    for dir_path, _, file_names in os.walk(path):
+        for name in file_names:
+            try:
+                total += os.path.getsize(os.path.join(dir_path, name))
+            except OSError:
+                pass
+    return total
+
+
+def _prune_trace_cache() -> None:
+    """Remove the least recently used cached outputs until the rest fit in TRACE_CACHE_MAX_BYTES."""
+    try:
+        entries = [entry for entry in os.scandir(TRACE_CACHE_DIR)
+                   if entry.is_dir() and not entry.name.endswith(".tmp")]
+        # Entries are touched on every hit, so newest mtime means most recently used
+        entries = sorted(((entry.stat().st_mtime, _tree_size(entry.path), entry.path)
+                          for entry in entries), reverse=True)
+    except OSError:
+        return
+    total = 0
+    for _, size, path in entries:
+        if total + size > TRACE_CACHE_MAX_BYTES:
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            total += size
+
+
+def _trace_cache_entry(trace_path: str, args: tuple) -> Optional[str]:
+    """Return the cache directory for an output of trace_path, or None if it cannot be cached.
     
-    if time_limit:
-        cmd.extend(['--time-limit', str(time_limit)])
-        
+    Args:
+        trace_path: Path to the trace file the output is derived from
+        args: Everything else the output depends on
+    """
+    key = _trace_key(trace_path)
+    if key is None:
+        return None
+    args_hash = hashlib.sha1(repr((developer_dir(), xcode_version(), args)).encode("utf-8")).hexdigest()
+    return os.path.join(TRACE_CACHE_DIR, f"{key}-{args_hash[:16]}")
+
+
+def _restore_trace_output(entry_dir: str, output_path: str) -> bool:
+    """Copy a cached output to output_path, returning False if there is none."""
+    cached_output = os.path.join(entry_dir, "output")
+    if not os.path.exists(cached_output):
+        return False
+    _copy_output(cached_output, output_path)
     try:
-        subprocess.run(cmd, check=True)
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to record trace: {e.stderr}")
+        os.utime(entry_dir)
+    except OSError:
+        pass
+    return True
 
 
-def export(trace_path: str, output_path: str, type: str = "json") -> None:
+def _save_trace_output(entry_dir: str, output_path: str) -> None:
+    """Keep a copy of a freshly produced output_path in the cache."""
+    # The cached copy is only an optimization, so failures are ignored
+    tmp_dir = None
+    try:
+        if _tree_size(output_path) > TRACE_CACHE_MAX_BYTES:
+            return
+        os.makedirs(TRACE_CACHE_DIR, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=TRACE_CACHE_DIR, suffix=".tmp")
+        _copy_output(output_path, os.path.join(tmp_dir, "output"))
+        os.rename(tmp_dir, entry_dir)
+    except OSError:
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return
+    _prune_trace_cache()
+
+
+def _cached_trace_output(trace_path: str, args: tuple, output_path: str,
+                         produce: Callable[[], None]) -> None:
+    """Produce output_path from a trace, or restore it from an earlier identical run.
+    
+    Args:
+        trace_path: Path to the trace file the output is derived from
+        args: Everything else the output depends on
+        output_path: File or directory written by produce
+        produce: Runs xctrace to write output_path
+    """
+    entry_dir = _trace_cache_entry(trace_path, args)
+    if entry_dir is None:
+        produce()
+    elif not _restore_trace_output(entry_dir, output_path):
+        produce()
+        _save_trace_output(entry_dir, output_path)
+
+
+def export(trace_path: str, output_path: str, type: str = "json", compress: bool = False,
+           use_cache: bool = True) -> str:
     """
     Export trace data to specified format.
     
@@ -65,19 +220,126 @@ def export(trace_path: str, output_path: str, type: str = "json") -> None:
         trace_path: Path to the trace file
         output_path: Path to save the exported data
         type: Export format (json, html, etc.)
+        compress: Stream the export through zstd into output_path + ".zst"
+        use_cache: Reuse (and keep a copy of) the export of an unchanged trace
+        
+    Returns:
+        str: Path of the written export
     """
+    written_path = output_path + '.zst' if compress else output_path
+    if not use_cache:
+        _export(trace_path, output_path, type, compress)
+        return written_path
+    _cached_trace_output(trace_path, ('export', type, compress), written_path,
+                         lambda: _export(trace_path, output_path, type, compress))
+    return written_path
+
+
+def _export_command(trace_path: str, type: str) -> List[str]:
+    return [
+        find_tool('xctrace'), 'export',
+        '--input', trace_path,
+        '--type', type
+    ]
+
+
+def _export(trace_path: str, output_path: str, type: str, compress: bool) -> None:
+    cmd = _export_command(trace_path, type)
+    
+    if not compress:
+        result = subprocess.run(cmd + ['--output', output_path], capture_output=True,
+                                stdin=subprocess.DEVNULL, env=xcrun_env(), close_fds=False)
+        if result.returncode != 0:
+            raise Exception(f"Failed to export trace: {result.stderr.decode('utf-8', 'replace')}")
+        return
+    
+    # Without --output xctrace writes the export to stdout, which is compressed
+    # on the fly so the uncompressed export never touches the disk
+    # The compressed stream goes into a file next to the .zst, which only replaces
+    # an earlier export once xctrace succeeded and the stream is complete
+    compressed_path = output_path + '.zst'
+    f = _temp_beside(compressed_path)
+    try:
+        with f, tempfile.TemporaryFile() as err:
+            proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=err,
+                                    env=xcrun_env(), close_fds=False)
+            try:
+                zstandard.ZstdCompressor(level=3, threads=-1).copy_stream(proc.stdout, f)
+            except BaseException:
+                # e.g. disk full: stop xctrace instead of letting it block on the pipe
+                proc.kill()
+                proc.wait()
+                raise
+            finally:
+                proc.stdout.close()
+            if proc.wait() != 0:
+                err.seek(0)
+                raise Exception(f"Failed to export trace: {err.read().decode('utf-8', 'replace')}")
+        os.replace(f.name, compressed_path)
+    except BaseException:
+        _remove_quietly(f.name)
+        raise
+
+
+def iter_export_events(trace_path: str, prefix: str = 'events.item') -> Iterator[Any]:
+    """
+    Export a trace as JSON and yield its events one at a time.
+    
+    The export is written to a temporary file and parsed incrementally, so
+    memory use does not grow with the size of the trace.
+    
+    Args:
+        trace_path: Path to the trace file
+        prefix: ijson prefix of the items to yield (e.g. 'events.item')
+    """
+    with tempfile.TemporaryDirectory(prefix='mcpxcode-') as tmp_dir:
+        # Parsed once and thrown away, so not worth a permanent copy in the cache
+        export_path = export(trace_path, os.path.join(tmp_dir, 'export.json'), use_cache=False)
+        with open(export_path, 'rb') as f:
+            # Floats instead of Decimal keep events serializable by orjson
+            yield from ijson.items(f, prefix, use_float=True)
+
+
+def export_events(trace_path: str, prefix: str = 'events.item', offset: int = 0,
+                  limit: Optional[int] = None) -> List[Any]:
+    """
+    Return a window of the events of a trace's JSON export.
+    
+    Args:
+        trace_path: Path to the trace file
+        prefix: ijson prefix of the items to return (e.g. 'events.item')
+        offset: Number of events to skip
+        limit: Maximum number of events to return (all remaining events if None)
+    """
+    stop = None if limit is None else offset + limit
+    events = iter_export_events(trace_path, prefix)
     try:
-        subprocess.run([
-            'xctrace', 'export',
-            '--input', trace_path,
-            '--output', output_path,
-            '--type', type
-        ], check=True)
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to export trace: {e.stderr}")
+        return list(itertools.islice(events, offset, stop))
+    finally:
+        events.close()
+
+
+def export_slice(trace_path: str, xpath: str) -> str:
+    """
+    Export only the part of a trace selected by an XPath expression.
+    
+    Args:
+        trace_path: Path to the trace file
+        xpath: XPath into the trace's table of contents
+            (e.g. '/trace-toc/run[@number="1"]/data/table[@schema="time-profile"]')
+    """
+    result = subprocess.run([
+        find_tool('xctrace'), 'export',
+        '--input', trace_path,
+        '--xpath', xpath
+    ], capture_output=True, encoding='utf-8', errors='replace', stdin=subprocess.DEVNULL,
+       env=xcrun_env(), close_fds=False)
+    if result.returncode != 0:
+        raise Exception(f"Failed to export trace slice: {result.stderr}")
+    return result.stdout
 
 
-def record_with_options(template: str, device_id: str, app_bundle_id: str, 
+async def record_with_options(template: str, device_id: str, app_bundle_id: str, 
                        output_path: str, time_limit: Optional[int] = None,
                        template_options: Optional[Dict[str, str]] = None,
                        launch_args: Optional[List[str]] = None,
@@ -96,7 +358,7 @@ def record_with_options(template: str, device_id: str, app_bundle_id: str,
         env_vars: Optional environment variables for the app
     """
     cmd = [
-        'xctrace', 'record',
+        await asyncio.to_thread(find_tool, 'xctrace'), 'record',
         '--template', template,
         '--device', device_id,
         '--target', app_bundle_id,
@@ -111,22 +373,20 @@ def record_with_options(template: str, device_id: str, app_bundle_id: str,
         for key, value in template_options.items():
             cmd.extend(['--template-option', f"{key}={value}"])
     
-    # Add launch arguments
+    # Add launch arguments, one flag per argument so arguments may contain spaces
     if launch_args:
-        cmd.extend(['--launch-args', ' '.join(launch_args)])
+        for arg in launch_args:
+            cmd.extend(['--launch-args', arg])
     
     # Add environment variables
     if env_vars:
         for key, value in env_vars.items():
             cmd.extend(['--setenv', f"{key}={value}"])
             
-    try:
-        subprocess.run(cmd, check=True)
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to record trace: {e.stderr}")
+    await run_async(cmd, "Failed to record trace")
 
 
-def attach(pid: int, template: str, output_path: str, time_limit: Optional[int] = None) -> None:
+async def attach(pid: int, template: str, output_path: str, time_limit: Optional[int] = None) -> None:
     """
     Attach to a running process for tracing.
     
@@ -137,7 +397,7 @@ def attach(pid: int, template: str, output_path: str, time_limit: Optional[int]
         time_limit: Optional recording time limit in seconds
     """
     cmd = [
-        'xctrace', 'attach',
+        await asyncio.to_thread(find_tool, 'xctrace'), 'attach',
         '--pid', str(pid),
         '--template', template,
         '--output', output_path
@@ -146,10 +406,7 @@ def attach(pid: int, template: str, output_path: str, time_limit: Optional[int]
     if time_limit:
         cmd.extend(['--time-limit', str(time_limit)])
         
-    try:
-        subprocess.run(cmd, check=True)
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to attach tracer: {e.stderr}")
+    await run_async(cmd, "Failed to attach tracer")
 
 
 def diagnose_archive(archive_path: str, output_dir: str) -> None:
@@ -160,14 +417,13 @@ def diagnose_archive(archive_path: str, output_dir: str) -> None:
         archive_path: Path to the trace archive
         output_dir: Directory to save the diagnosis results
     """
-    try:
-        subprocess.run([
-            'xctrace', 'diagnose',
-            '--input', archive_path,
-            '--output', output_dir
-        ], check=True)
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to diagnose archive: {e.stderr}")
+    result = subprocess.run([
+        find_tool('xctrace'), 'diagnose',
+        '--input', archive_path,
+        '--output', output_dir
+    ], capture_output=True, stdin=subprocess.DEVNULL, env=xcrun_env(), close_fds=False)
+    if result.returncode != 0:
+        raise Exception(f"Failed to diagnose archive: {result.stderr.decode('utf-8', 'replace')}")
 
 
 def document_template(template: str, output_path: str) -> None:
@@ -179,43 +435,54 @@ def document_template(template: str, output_path: str) -> None:
         output_path: Path to save the documentation
     """
     try:
-        result = subprocess.run([
-            'xctrace', 'document-template',
-            '--template', template
-        ], capture_output=True, text=True, check=True)
-        
-        # Write documentation to file
-        with open(output_path, 'w') as f:
-            f.write(result.stdout)
-            
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to document template: {e.stderr}")
+        # xctrace writes into a file next to output_path, which replaces output_path
+        # only once the documentation is complete
+        f = _temp_beside(output_path)
     except IOError as e:
         raise Exception(f"Failed to write documentation: {str(e)}")
+    try:
+        with f:
+            result = subprocess.run([
+                find_tool('xctrace'), 'document-template',
+                '--template', template
+            ], stdout=f, stderr=subprocess.PIPE, stdin=subprocess.DEVNULL, env=xcrun_env(), close_fds=False)
+        if result.returncode != 0:
+            raise Exception(f"Failed to document template: {result.stderr.decode('utf-8', 'replace')}")
+        os.replace(f.name, output_path)
+    except BaseException:
+        _remove_quietly(f.name)
+        raise
 
 
-def analyze_trace(trace_path: str, output_dir: str) -> None:
+async def analyze_trace(trace_path: str, output_dir: str, use_cache: bool = True) -> None:
     """
     Analyze a trace file and generate performance reports.
     
     Args:
         trace_path: Path to the trace file
         output_dir: Directory to save analysis reports
+        use_cache: Reuse (and keep a copy of) the reports of an unchanged trace
     """
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
-    try:
-        subprocess.run([
-            'xctrace', 'analyze',
-            '--input', trace_path,
-            '--output', output_dir
-        ], check=True)
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to analyze trace: {e.stderr}")
+    # Only an empty directory ends up holding nothing but this trace's reports
+    entry_dir = None
+    if use_cache and not os.listdir(output_dir):
+        entry_dir = await asyncio.to_thread(_trace_cache_entry, trace_path, ('analyze',))
+    if entry_dir is not None and await asyncio.to_thread(_restore_trace_output, entry_dir, output_dir):
+        return
+    
+    await run_async([
+        await asyncio.to_thread(find_tool, 'xctrace'), 'analyze',
+        '--input', trace_path,
+        '--output', output_dir
+    ], "Failed to analyze trace")
+    if entry_dir is not None:
+        await asyncio.to_thread(_save_trace_output, entry_dir, output_dir)
 
 
-def compare_traces(base_trace: str, comparison_trace: str, output_path: str) -> None:
+async def compare_traces(base_trace: str, comparison_trace: str, output_path: str) -> None:
     """
     Compare two trace files and generate a comparison report.
     
@@ -224,12 +491,52 @@ def compare_traces(base_trace: str, comparison_trace: str, output_path: str) ->
         comparison_trace: Path to the comparison trace file
         output_path: Path to save the comparison report
     """
+    await run_async([
+        await asyncio.to_thread(find_tool, 'xctrace'), 'compare',
+        '--base', base_trace,
+        '--compare', comparison_trace,
+        '--output', output_path
+    ], "Failed to compare traces")
+
+
+async def compare_traces_full(base_trace: str, comparison_trace: str, output_path: str,
+                              export_dir: str, type: str = "json") -> Tuple[str, str]:
+    """
+    Export two traces side by side, then compare them.
+    
+    Both exports run concurrently and are written to export_dir as
+    base.<type> and comparison.<type>, next to the report produced by
+    `xctrace compare` from the original traces. Existing files are never
+    overwritten.
+    
+    Args:
+        base_trace: Path to the base trace file
+        comparison_trace: Path to the comparison trace file
+        output_path: Path to save the comparison report
+        export_dir: Directory to save the two exports in
+        type: Export format (json, html, etc.)
+        
+    Returns:
+        Tuple[str, str]: Paths of the base and comparison exports
+    """
+    base_path = os.path.join(export_dir, f"base.{type}")
+    comparison_path = os.path.join(export_dir, f"comparison.{type}")
+    for path in (base_path, comparison_path):
+        if os.path.exists(path):
+            raise Exception(f"Failed to export trace: {path} already exists")
+    os.makedirs(export_dir, exist_ok=True)
+    
+    commands = [await asyncio.to_thread(_export_command, trace_path, type) + ['--output', path]
+                for trace_path, path in ((base_trace, base_path), (comparison_trace, comparison_path))]
+    exports = [asyncio.ensure_future(run_async(cmd, "Failed to export trace")) for cmd in commands]
     try:
-        subprocess.run([
-            'xctrace', 'compare',
-            '--base', base_trace,
-            '--compare', comparison_trace,
-            '--output', output_path
-        ], check=True)
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to compare traces: {e.stderr}")
+        await asyncio.gather(*exports)
+    except BaseException:
+        # Cancellation or a failed export stops (and kills) the other one too
+        for task in exports:
+            task.cancel()
+        await asyncio.gather(*exports, return_exceptions=True)
+        raise
+    
+    await compare_traces(base_trace, comparison_trace, output_path)
+    return base_path, comparison_path